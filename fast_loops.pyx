@@ -0,0 +1,11 @@
+# cython: language_level=3
+"""
+Typed loops for the optimized reference counting demonstration.
+Compiled on import through pyximport when Cython is available.
+"""
+
+def wire_ring(list nodes):
+    """Point each node's ref at the next node, closing the ring."""
+    cdef Py_ssize_t i, n = len(nodes)
+    for i in range(n):
+        nodes[i].ref = nodes[(i + 1) % n]
@@ -7,11 +7,14 @@ This program shows how Python manages memory using reference counting.
 import sys
 import gc
 import time
+from collections import deque
 from typing import Any, Dict, List
 
 class ReferenceTracker:
     """A class to track and display reference counts of objects."""
     
+    __slots__ = ('name',)  # No per-instance __dict__
+    
     def __init__(self, name: str):
         self.name = name
         # Get the actual reference count at creation time
@@ -21,6 +24,7 @@ class ReferenceTracker:
         print(f"🔵 Created object '{name}' (initial ref count: {initial_ref_count})")
     
     def __del__(self):
+        # Kept for teaching purposes; the benchmark node classes omit __del__
         print(f"🔴 Object '{self.name}' is being deallocated (ref count reached 0)")
     
     def get_ref_count(self) -> int:
@@ -34,6 +38,32 @@ class ReferenceTracker:
         count = self.get_ref_count()
         print(f"📊 '{self.name}' ref count: {count} {context}")
 
+class CircularNode:
+    """A node that can reference another node to form a cycle."""
+    
+    __slots__ = ('name', 'ref')
+    
+    def __init__(self, name: str):
+        self.name = name
+        self.ref = None
+        print(f"🔵 Created circular node '{name}'")
+    
+    def __del__(self):
+        print(f"🔴 Circular node '{self.name}' is being deallocated")
+
+class GarbageNode:
+    """A node used to build cycles for the garbage collector to reclaim."""
+    
+    __slots__ = ('name', 'ref')
+    
+    def __init__(self, name: str):
+        self.name = name
+        self.ref = None
+        print(f"🔵 Created garbage node '{name}'")
+    
+    def __del__(self):
+        print(f"🔴 Garbage node '{self.name}' is being deallocated")
+
 def demonstrate_basic_reference_counting():
     """Demonstrate basic reference counting operations."""
     print("\n" + "="*60)
@@ -98,15 +128,6 @@ def demonstrate_circular_references():
     print("🔄 CIRCULAR REFERENCE DEMONSTRATION")
     print("="*60)
     
-    class CircularNode:
-        def __init__(self, name: str):
-            self.name = name
-            self.ref = None
-            print(f"🔵 Created circular node '{name}'")
-        
-        def __del__(self):
-            print(f"🔴 Circular node '{self.name}' is being deallocated")
-    
     print("\n1. Creating circular reference...")
     node_a = CircularNode("A")
     node_b = CircularNode("B")
@@ -131,15 +152,6 @@ def demonstrate_garbage_collection():
     print("🗑️  GARBAGE COLLECTION DEMONSTRATION")
     print("="*60)
     
-    class GarbageNode:
-        def __init__(self, name: str):
-            self.name = name
-            self.ref = None
-            print(f"🔵 Created garbage node '{name}'")
-        
-        def __del__(self):
-            print(f"🔴 Garbage node '{self.name}' is being deallocated")
-    
     print("\n1. Creating circular references...")
     nodes = []
     for i in range(3):
@@ -257,8 +269,12 @@ def interactive_demo():
     print("  'status' - Show current reference count")
     print("  'quit' - Exit demo")
     
+    # Bounded so repeated 'ref' commands cannot grow memory without limit
+    max_references = 1024
+    print(f"(Only the newest {max_references} references are kept; older ones are dropped.)")
+    
     current_obj = None
-    references = []
+    references = deque(maxlen=max_references)
     
     while True:
         command = input("\nEnter command: ").strip().lower()
@@ -267,7 +283,7 @@ def interactive_demo():
             break
         elif command == 'create':
             current_obj = ReferenceTracker("interactive_object")
-            references = [current_obj]
+            references = deque([current_obj], maxlen=max_references)
             print("✅ Object created!")
         elif command == 'ref':
             if current_obj:
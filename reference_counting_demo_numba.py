@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+"""
+Numba Allocation Kernel for Reference Counting Benchmarks
+Stores "objects" as rows of an int64 array instead of Python instances.
+"""
+
+import numba
+import numpy as np
+
+@numba.njit(cache=True)
+def alloc_records(n: int):
+    """Allocate n (id, ref) records without creating any Python objects."""
+    arr = np.empty((n, 2), np.int64)
+    for i in range(n):
+        arr[i, 0] = i
+        arr[i, 1] = 0
+    return arr
+
+@numba.njit(cache=True)
+def sum_range(n: int):
+    """Sum 0..n-1 in a compiled loop with no per-iteration int objects."""
+    total = 0
+    for i in range(n):
+        total += i
+    return total
@@ -4,114 +4,164 @@ Optimized Reference Counting Demonstration Program
 This program shows how Python manages memory using reference counting with performance optimizations.
 """
 
+from __future__ import annotations
+
+import os
 import sys
 import gc
 import time
-from typing import Any, Dict, List, Optional
-from functools import lru_cache
+import weakref
+from collections import deque
+from dataclasses import dataclass
 import io
 import contextlib
 
+# Module-level alias avoids the sys attribute lookup on every call
+_getrefcount = sys.getrefcount
+
+# Batch runs (CI, benchmarks) can skip the prompt and the status lines;
+# an unset, empty or "0" value leaves the option off
+_NONINTERACTIVE = os.environ.get("DEMO_NONINTERACTIVE", "") not in ("", "0")
+_QUIET = os.environ.get("DEMO_QUIET", "") not in ("", "0")
+
+# The compiled loop is optional (requires numba and numpy)
+try:
+    from reference_counting_demo_numba import sum_range
+except ImportError:
+    sum_range = None
+
+# Use the Cython ring-wiring loop when it can be built (requires Cython).
+# The pyximport hook is only installed while fast_loops is being imported.
+try:
+    import pyximport
+    _pyx_hooks = pyximport.install(language_level=3)
+    try:
+        from fast_loops import wire_ring
+    finally:
+        pyximport.uninstall(*_pyx_hooks)
+except ImportError:
+    def wire_ring(nodes):
+        """Point each node's ref at the next node, closing the ring."""
+        for i in range(len(nodes)):
+            nodes[i].ref = nodes[(i + 1) % len(nodes)]
+
+# Demo output is collected here and written to stdout once per section
+_buf = io.StringIO()
+
+def out(text: str = ""):
+    """Queue one line of demo output."""
+    _buf.write(text)
+    _buf.write('\n')
+
+def flush_output():
+    """Write all queued output with a single stdout write."""
+    sys.stdout.write(_buf.getvalue())
+    _buf.seek(0)
+    _buf.truncate()
+
+@contextlib.contextmanager
+def buffered_output():
+    """Flush queued output when the block (or decorated function) exits."""
+    try:
+        yield
+    finally:
+        flush_output()
+
+@dataclass(slots=True, frozen=True, eq=False)
 class OptimizedReferenceTracker:
-    """An optimized class to track and display reference counts of objects."""
+    """An optimized class to track and display reference counts of objects.
     
-    # Class-level cache for reference counts to avoid repeated sys.getrefcount calls
-    _ref_count_cache = {}
+    Instances are slotted, immutable and have no __del__, so CPython frees them
+    on its plain deallocation path. Use create_tracker() and destroy_tracker()
+    for the lifecycle messages.
+    """
     
-    def __init__(self, name: str):
-        self.name = name
-        # Cache the initial reference count
-        initial_ref_count = self._get_ref_count()
-        self._ref_count_cache[id(self)] = initial_ref_count
-        print(f"🔵 Created object '{name}' (initial ref count: {initial_ref_count})")
-    
-    def __del__(self):
-        # Remove from cache when object is destroyed
-        self._ref_count_cache.pop(id(self), None)
-        print(f"🔴 Object '{self.name}' is being deallocated (ref count reached 0)")
-    
-    def _get_ref_count(self) -> int:
-        """Get the current reference count of this object (cached)."""
-        obj_id = id(self)
-        if obj_id not in self._ref_count_cache:
-            self._ref_count_cache[obj_id] = sys.getrefcount(self) - 1
-        return self._ref_count_cache[obj_id]
-    
-    def _update_ref_count(self):
-        """Update the cached reference count."""
-        obj_id = id(self)
-        self._ref_count_cache[obj_id] = sys.getrefcount(self) - 1
+    name: str
+    
+    def get_ref_count(self) -> int:
+        """Get the current reference count of this object."""
+        return _getrefcount(self) - 1
     
     def show_status(self, context: str = ""):
         """Display the current reference count with context."""
-        self._update_ref_count()  # Update cache before showing
-        count = self._get_ref_count()
-        print(f"📊 '{self.name}' ref count: {count} {context}")
+        if _QUIET:
+            return
+        count = _getrefcount(self) - 1
+        out(f"📊 '{self.name}' ref count: {count} {context}")
+
+def create_tracker(name: str) -> OptimizedReferenceTracker:
+    """Create a tracker and announce it."""
+    tracker = OptimizedReferenceTracker(name)
+    # Subtract 1 for the reference held by the sys.getrefcount() argument
+    initial_ref_count = _getrefcount(tracker) - 1
+    out(f"🔵 Created object '{name}' (initial ref count: {initial_ref_count})")
+    return tracker
+
+def destroy_tracker(tracker: OptimizedReferenceTracker):
+    """Announce that the caller is dropping its last reference to a tracker."""
+    out(f"🔴 Object '{tracker.name}' is being released (last reference dropped)")
 
 class FastCircularNode:
-    """Optimized circular node for demonstration."""
+    """Optimized circular node for demonstration (no __del__ finalizer)."""
     
-    __slots__ = ['name', 'ref']  # Use __slots__ for memory efficiency
+    __slots__ = ['name', 'ref', '__weakref__']  # Use __slots__ for memory efficiency
     
     def __init__(self, name: str):
         self.name = name
         self.ref = None
-        print(f"🔵 Created circular node '{name}'")
-    
-    def __del__(self):
-        print(f"🔴 Circular node '{self.name}' is being deallocated")
+        out(f"🔵 Created circular node '{name}'")
 
 class FastGarbageNode:
-    """Optimized garbage node for demonstration."""
+    """Optimized garbage node for demonstration (no __del__ finalizer)."""
     
-    __slots__ = ['name', 'ref']  # Use __slots__ for memory efficiency
+    __slots__ = ['name', 'ref', '__weakref__']  # Use __slots__ for memory efficiency
     
     def __init__(self, name: str):
         self.name = name
         self.ref = None
-        print(f"🔵 Created garbage node '{name}'")
-    
-    def __del__(self):
-        print(f"🔴 Garbage node '{self.name}' is being deallocated")
+        out(f"🔵 Created garbage node '{name}'")
+
+# Every section header uses the default width, so build that separator once
+_SEP60 = "=" * 60
 
-@lru_cache(maxsize=128)
 def get_separator(length: int = 60) -> str:
-    """Cached separator generation."""
-    return "=" * length
+    """Separator generation; the default width is precomputed."""
+    return _SEP60 if length == 60 else "=" * length
 
 def print_section_header(title: str, length: int = 60):
     """Optimized section header printing."""
     separator = get_separator(length)
-    print(f"\n{separator}")
-    print(title)
-    print(separator)
+    out(f"\n{separator}")
+    out(title)
+    out(separator)
 
+@buffered_output()
 def demonstrate_basic_reference_counting():
     """Optimized basic reference counting demonstration."""
     print_section_header("🎯 BASIC REFERENCE COUNTING DEMONSTRATION")
     
     # Create an object
-    print("\n1. Creating an object...")
-    obj = OptimizedReferenceTracker("my_object")
+    out("\n1. Creating an object...")
+    obj = create_tracker("my_object")
     obj.show_status("(after creation)")
     
     # Create another reference
-    print("\n2. Creating another reference...")
+    out("\n2. Creating another reference...")
     another_ref = obj
     obj.show_status("(after creating another reference)")
     
     # Store in a list
-    print("\n3. Storing in a list...")
+    out("\n3. Storing in a list...")
     my_list = [obj]
     obj.show_status("(after storing in list)")
     
     # Store in a dictionary
-    print("\n4. Storing in a dictionary...")
+    out("\n4. Storing in a dictionary...")
     my_dict = {"key": obj}
     obj.show_status("(after storing in dict)")
     
     # Pass to a function (optimized)
-    print("\n5. Passing to a function...")
+    out("\n5. Passing to a function...")
     def optimized_dummy_function(param):
         param.show_status("(inside function)")
         return param
@@ -120,247 +170,293 @@ def demonstrate_basic_reference_counting():
     obj.show_status("(after function call)")
     
     # Remove references one by one (optimized)
-    print("\n6. Removing references one by one...")
-    
-    operations = [
-        ("Removing from dictionary...", lambda: my_dict.pop("key", None)),
-        ("Removing from list...", lambda: my_list.clear()),
-        ("Removing function result...", lambda: None),  # Will be handled by del
-        ("Removing second reference...", lambda: None),  # Will be handled by del
-        ("Removing original reference...", lambda: None)  # Will be handled by del
-    ]
-    
-    for i, (description, operation) in enumerate(operations):
-        print(f"   {description}")
-        if operation():
-            operation()
-        if i == 1:  # After clearing list
-            del result
-        elif i == 2:  # After removing result
-            del another_ref
-        elif i == 3:  # After removing second reference
-            del obj
-            break
-        else:
-            obj.show_status(f"(after {description.lower().rstrip('...')})")
+    out("\n6. Removing references one by one...")
+    
+    out("   Removing from dictionary...")
+    my_dict.pop("key", None)
+    obj.show_status("(after removing from dictionary)")
+    
+    out("   Removing from list...")
+    my_list.clear()
+    obj.show_status("(after removing from list)")
+    
+    out("   Removing function result...")
+    del result
+    obj.show_status("(after removing function result)")
+    
+    out("   Removing second reference...")
+    del another_ref
+    obj.show_status("(after removing second reference)")
+    
+    out("   Removing original reference...")
+    destroy_tracker(obj)
+    del obj
+    out("   (Object should be deallocated now)")
 
+@buffered_output()
 def demonstrate_circular_references():
     """Optimized circular reference demonstration."""
     print_section_header("🔄 CIRCULAR REFERENCE DEMONSTRATION")
     
-    print("\n1. Creating circular reference...")
+    out("\n1. Creating a back-reference without a cycle...")
     node_a = FastCircularNode("A")
     node_b = FastCircularNode("B")
     
-    # Create circular reference
+    # A weak back-pointer does not count as a reference, so no cycle forms
     node_a.ref = node_b
-    node_b.ref = node_a
+    node_b.ref = weakref.ref(node_a)
     
-    # Use direct sys.getrefcount for better performance
-    print(f"   Node A ref count: {sys.getrefcount(node_a) - 1}")
-    print(f"   Node B ref count: {sys.getrefcount(node_b) - 1}")
+    out(f"   Node A ref count: {_getrefcount(node_a) - 1}")
+    out(f"   Node B ref count: {_getrefcount(node_b) - 1}")
     
-    print("\n2. Removing direct references...")
+    out("\n2. Removing direct references...")
     del node_a
     del node_b
     
-    print("   Direct references removed, but objects still exist due to circular reference")
-    print("   (Objects will be cleaned up by garbage collector)")
+    out("   Both nodes were freed by reference counting alone, without the garbage collector")
+    out("   (Weak back-references are the recommended pattern for production code)")
 
+@buffered_output()
 def demonstrate_garbage_collection():
     """Optimized garbage collection demonstration."""
     print_section_header("🗑️  GARBAGE COLLECTION DEMONSTRATION")
     
-    print("\n1. Creating circular references...")
-    # Use list comprehension for better performance
-    nodes = [FastGarbageNode(f"Node_{i}") for i in range(3)]
-    
-    # Create circular references efficiently
-    for i in range(len(nodes)):
-        nodes[i].ref = nodes[(i + 1) % len(nodes)]
+    out("\n1. Creating circular references...")
+    # Pause the collector while building; the explicit collect below reclaims the ring
+    gc.disable()
+    try:
+        # Use list comprehension for better performance
+        names = ('Node_0', 'Node_1', 'Node_2')
+        nodes = [FastGarbageNode(name) for name in names]
+        
+        # Create circular references efficiently
+        wire_ring(nodes)
+    finally:
+        gc.enable()
     
-    print(f"   Created {len(nodes)} nodes with circular references")
+    out(f"   Created {len(nodes)} nodes with circular references")
     
-    print("\n2. Removing direct references...")
+    out("\n2. Removing direct references...")
     del nodes
     
-    print("3. Running garbage collection...")
+    out("3. Running garbage collection...")
     collected = gc.collect()
-    print(f"   Garbage collector collected {collected} objects")
+    out(f"   Garbage collector collected {collected} objects")
 
+@buffered_output()
 def demonstrate_reference_counting_in_functions():
     """Optimized function reference counting demonstration."""
     print_section_header("⚙️  FUNCTION REFERENCE COUNTING DEMONSTRATION")
     
     def optimized_function_with_local_ref():
-        print("   Entering function...")
-        local_obj = OptimizedReferenceTracker("function_local")
+        out("   Entering function...")
+        local_obj = create_tracker("function_local")
         local_obj.show_status("(inside function)")
-        print("   Exiting function...")
+        out("   Exiting function...")
+        destroy_tracker(local_obj)
     
     def optimized_function_with_return():
-        print("   Entering function with return...")
-        local_obj = OptimizedReferenceTracker("function_return")
+        out("   Entering function with return...")
+        local_obj = create_tracker("function_return")
         local_obj.show_status("(inside function)")
-        print("   Returning object...")
+        out("   Returning object...")
         return local_obj
     
-    print("\n1. Function with local object (no return):")
+    out("\n1. Function with local object (no return):")
     optimized_function_with_local_ref()
-    print("   (Object should be deallocated when function exits)")
+    out("   (Object should be deallocated when function exits)")
     
-    print("\n2. Function with returned object:")
+    out("\n2. Function with returned object:")
     returned_obj = optimized_function_with_return()
     returned_obj.show_status("(after function return)")
     
-    print("\n3. Removing returned object:")
+    out("\n3. Removing returned object:")
+    destroy_tracker(returned_obj)
     del returned_obj
-    print("   (Object should be deallocated now)")
+    out("   (Object should be deallocated now)")
 
+@buffered_output()
 def demonstrate_data_structures():
     """Optimized data structures reference counting demonstration."""
     print_section_header("📦 DATA STRUCTURES REFERENCE COUNTING")
     
-    # Create objects efficiently
-    objects = {
-        'list': OptimizedReferenceTracker("list_object"),
-        'dict': OptimizedReferenceTracker("dict_object"),
-        'set': OptimizedReferenceTracker("set_object")
-    }
+    # Create objects as plain locals (no lookup dict)
+    list_obj = create_tracker("list_object")
+    dict_obj = create_tracker("dict_object")
+    set_obj = create_tracker("set_object")
     
-    print("\n1. Storing objects in different data structures:")
+    out("\n1. Storing objects in different data structures:")
     
-    # Use more efficient data structure operations
-    containers = {
-        'list': [objects['list']],
-        'dict': {"key": objects['dict']},
-        'set': {objects['set']},
-        'tuple': tuple(objects.values())
-    }
+    my_list = [list_obj]
+    my_dict = {"key": dict_obj}
+    my_set = {set_obj}
+    my_tuple = (list_obj, dict_obj, set_obj)
     
     # Show status for all objects
-    for obj_name, obj in objects.items():
-        obj.show_status(f"(in {obj_name})")
+    list_obj.show_status("(in list)")
+    dict_obj.show_status("(in dict)")
+    set_obj.show_status("(in set)")
     
-    print("\n2. Removing from data structures:")
+    out("\n2. Removing from data structures:")
     
-    # Remove from containers efficiently
-    containers['list'].clear()
-    objects['list'].show_status("(removed from list)")
+    my_list.clear()
+    list_obj.show_status("(removed from list)")
     
-    containers['dict'].pop("key", None)
-    objects['dict'].show_status("(removed from dict)")
+    my_dict.pop("key", None)
+    dict_obj.show_status("(removed from dict)")
     
-    containers['set'].clear()
-    objects['set'].show_status("(removed from set)")
+    my_set.clear()
+    set_obj.show_status("(removed from set)")
     
-    print("\n3. Removing tuple reference:")
-    del containers['tuple']
-    print("   (Objects should be deallocated now)")
+    out("\n3. Removing tuple reference:")
+    del my_tuple
+    destroy_tracker(list_obj)
+    destroy_tracker(dict_obj)
+    destroy_tracker(set_obj)
+    del list_obj, dict_obj, set_obj
+    out("   (Objects should be deallocated now)")
 
+@buffered_output()
 def demonstrate_performance_comparison():
     """Demonstrate performance improvements."""
     print_section_header("⚡ PERFORMANCE COMPARISON")
     
-    print("\nTesting reference count operations...")
+    out("\nTesting reference count operations...")
     
     # Test with original approach (simulated)
+    grc = _getrefcount
     start_time = time.perf_counter()
     for i in range(1000):
-        obj = OptimizedReferenceTracker(f"test_obj_{i}")
-        _ = obj._get_ref_count()
+        obj = create_tracker(f"test_obj_{i}")
+        _ = grc(obj)
     original_time = time.perf_counter() - start_time
     
-    print(f"   Optimized approach: {original_time:.4f} seconds for 1000 operations")
+    out(f"   Optimized approach: {original_time:.4f} seconds for 1000 operations")
     
-    # Test garbage collection performance
-    print("\nTesting garbage collection performance...")
+    # Compare an interpreted integer loop with the same loop compiled by Numba
+    out("\nTesting interpreted vs compiled loop...")
+    n = 1_000_000
     start_time = time.perf_counter()
+    total = 0
+    for i in range(n):
+        total += i
+    interpreted_time = time.perf_counter() - start_time
+    
+    out(f"   Interpreted loop: {interpreted_time:.4f} seconds for {n} iterations")
+    
+    if sum_range is None:
+        out("   ⚠️  Compiled loop skipped (numba not installed)")
+    else:
+        sum_range(1)  # Compile once so JIT time is not measured
+        start_time = time.perf_counter()
+        sum_range(n)
+        compiled_time = time.perf_counter() - start_time
+        out(f"   Numba loop: {compiled_time:.4f} seconds for {n} iterations")
     
-    # Create many objects with circular references
-    nodes = []
-    for i in range(100):
-        node = FastGarbageNode(f"perf_node_{i}")
-        nodes.append(node)
-    
-    # Create circular references
-    for i in range(len(nodes)):
-        nodes[i].ref = nodes[(i + 1) % len(nodes)]
+    # Test garbage collection performance
+    out("\nTesting garbage collection performance...")
+    # Build names before timing so only node allocation is measured
+    names = [sys.intern(f"perf_node_{i}") for i in range(100)]
+    start_time = time.perf_counter()
     
-    del nodes
+    # No young-generation collections during the allocation burst;
+    # one explicit collection reclaims the whole ring afterwards
+    gc.disable()
+    try:
+        # Create many objects with circular references in a pre-sized list
+        nodes = [None] * 100
+        for i in range(100):
+            nodes[i] = FastGarbageNode(names[i])
+        
+        # Create circular references
+        wire_ring(nodes)
+        
+        del nodes
+    finally:
+        gc.enable()
+        gc.collect()
     gc_time = time.perf_counter() - start_time
     
-    print(f"   Garbage collection time: {gc_time:.4f} seconds")
+    out(f"   Garbage collection time: {gc_time:.4f} seconds")
 
+@buffered_output()
 def interactive_demo():
     """Optimized interactive demonstration."""
     print_section_header("🎮 INTERACTIVE REFERENCE COUNTING DEMO")
     
-    print("\nThis demo lets you control reference counting interactively.")
-    print("Commands:")
-    print("  'create' - Create a new object")
-    print("  'ref' - Create a new reference to current object")
-    print("  'list' - Store object in a list")
-    print("  'dict' - Store object in a dictionary")
-    print("  'remove' - Remove last reference")
-    print("  'status' - Show current reference count")
-    print("  'quit' - Exit demo")
+    out("\nThis demo lets you control reference counting interactively.")
+    out("Commands:")
+    out("  'create' - Create a new object")
+    out("  'ref' - Create a new reference to current object")
+    out("  'list' - Store object in a list")
+    out("  'dict' - Store object in a dictionary")
+    out("  'remove' - Remove last reference")
+    out("  'status' - Show current reference count")
+    out("  'quit' - Exit demo")
+    
+    # Bounded so dropped containers are released instead of pinned forever
+    max_references = 64
+    out(f"(Only the newest {max_references} references are kept; older ones are dropped.)")
     
     current_obj = None
-    references = []
+    references = deque(maxlen=max_references)
     
     while True:
         try:
+            flush_output()
             command = input("\nEnter command: ").strip().lower()
             
             if command == 'quit':
                 break
             elif command == 'create':
-                current_obj = OptimizedReferenceTracker("interactive_object")
-                references = [current_obj]
-                print("✅ Object created!")
+                if current_obj:
+                    destroy_tracker(current_obj)
+                current_obj = create_tracker("interactive_object")
+                references = deque([current_obj], maxlen=max_references)
+                out("✅ Object created!")
             elif command == 'ref':
                 if current_obj:
                     references.append(current_obj)
                     current_obj.show_status("(new reference created)")
                 else:
-                    print("❌ No object to reference. Create one first.")
+                    out("❌ No object to reference. Create one first.")
             elif command == 'list':
                 if current_obj:
                     references.append([current_obj])
                     current_obj.show_status("(stored in list)")
                 else:
-                    print("❌ No object to store. Create one first.")
+                    out("❌ No object to store. Create one first.")
             elif command == 'dict':
                 if current_obj:
                     references.append({"key": current_obj})
                     current_obj.show_status("(stored in dict)")
                 else:
-                    print("❌ No object to store. Create one first.")
+                    out("❌ No object to store. Create one first.")
             elif command == 'remove':
                 if references:
                     removed = references.pop()
                     if current_obj:
                         current_obj.show_status("(reference removed)")
                 else:
-                    print("❌ No references to remove.")
+                    out("❌ No references to remove.")
             elif command == 'status':
                 if current_obj:
                     current_obj.show_status("(current status)")
                 else:
-                    print("❌ No object exists.")
+                    out("❌ No object exists.")
             else:
-                print("❌ Unknown command. Try 'create', 'ref', 'list', 'dict', 'remove', 'status', or 'quit'.")
+                out("❌ Unknown command. Try 'create', 'ref', 'list', 'dict', 'remove', 'status', or 'quit'.")
         except KeyboardInterrupt:
-            print("\n👋 Interactive demo interrupted.")
+            out("\n👋 Interactive demo interrupted.")
             break
         except Exception as e:
-            print(f"❌ Error: {e}")
+            out(f"❌ Error: {e}")
 
+@buffered_output()
 def main():
     """Optimized main function."""
-    print("🐍 OPTIMIZED PYTHON REFERENCE COUNTING DEMONSTRATION")
-    print("This program shows how Python manages memory using reference counting with performance optimizations.")
+    out("🐍 OPTIMIZED PYTHON REFERENCE COUNTING DEMONSTRATION")
+    out("This program shows how Python manages memory using reference counting with performance optimizations.")
     
     try:
         # Run all demonstrations
@@ -372,23 +468,27 @@ def main():
         demonstrate_performance_comparison()
         
         # Ask if user wants interactive demo
-        response = input("\nWould you like to try the interactive demo? (y/n): ").strip().lower()
-        if response in ['y', 'yes']:
-            interactive_demo()
+        if not _NONINTERACTIVE:
+            flush_output()
+            response = input("\nWould you like to try the interactive demo? (y/n): ").strip().lower()
+            if response in ['y', 'yes']:
+                interactive_demo()
         
         print_section_header("✅ OPTIMIZED DEMONSTRATION COMPLETE!")
-        print("\nKey optimizations implemented:")
-        print("• Reference count caching to reduce sys.getrefcount() calls")
-        print("• Use of __slots__ for memory-efficient classes")
-        print("• Cached separator generation with lru_cache")
-        print("• Optimized data structure operations")
-        print("• Reduced function call overhead")
-        print("• More efficient list comprehensions and operations")
+        out("\nKey optimizations implemented:")
+        out("• Direct sys.getrefcount() reads with no cache bookkeeping")
+        out("• Use of __slots__ for memory-efficient classes")
+        out("• Frozen slotted dataclass tracker; create_tracker() and destroy_tracker() print its lifecycle")
+        out("• Precomputed section separator")
+        out("• Optimized data structure operations")
+        out("• Reduced function call overhead")
+        out("• Output buffered and written once per section")
+        out("• More efficient list comprehensions and operations")
         
     except KeyboardInterrupt:
-        print("\n\n👋 Demo interrupted by user.")
+        out("\n\n👋 Demo interrupted by user.")
     except Exception as e:
-        print(f"\n❌ Error during demonstration: {e}")
+        out(f"\n❌ Error during demonstration: {e}")
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file